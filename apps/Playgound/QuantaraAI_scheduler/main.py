@@ -1,11 +1,12 @@
 import asyncio
 import datetime
+import functools
 import logging
 import os
+from collections.abc import Sequence
 
 import aiocron
 import polars as pl
-import pyarrow.compute as pc
 
 from libs.internals.indicators import calculate_ta_indicators
 from libs.repositories import IndicatorsRepository, OhlcvRepository
@@ -23,10 +24,10 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Time intervals for celestial observations
-interval_names = ["raw", "1h", "4h", "1d"]  # Temporal dimensions of market analysis
+interval_names = ("raw", "1h", "4h", "1d")  # Temporal dimensions of market analysis
 
 # Constellation of tracked assets
-COINS = [
+COINS: tuple[str, ...] = (
     # Celestial Bodies - Major
     "BTC",  # The Sun
     "ETH",  # The Moon
@@ -151,46 +152,135 @@ COINS = [
     "IMX",
     "SSV",
     "AI",
-]
+)
 
+# Column types of every OHLCV record, applied when frames are built
+OHLCV_SCHEMA = {
+    "timestamp": pl.Int64,
+    "symbol": pl.Utf8,
+    "open": pl.Float64,
+    "high": pl.Float64,
+    "low": pl.Float64,
+    "close": pl.Float64,
+    "volume": pl.Float64,
+}
 
-async def data_ingestion_job():
+# Collection schedule, aligned with the 30m raw observations
+INGESTION_CRON = "*/30 * * * *"
+
+# Longest lookback among the calculated indicators (EMA_50), shorter histories are skipped
+MIN_INDICATOR_ROWS = 50
+
+# Merge condition for every repository upsert, one row per symbol and timestamp
+UPSERT_PREDICATE = "s.timestamp == t.timestamp AND s.symbol == t.symbol"
+
+# Coins per data provider request and how many requests may be in flight at once
+PROVIDER_BATCH_SIZE = 10
+PROVIDER_MAX_CONCURRENCY = 4
+
+# Historical requests are heavier, seeding shares a smaller limit across all intervals
+SEED_MAX_CONCURRENCY = 20
+
+
+@functools.lru_cache(maxsize=1)
+def get_data_provider() -> DataProvider:
+    """
+    Returns the single cosmic data provider shared by seeding and every collection
+    """
+    return DataProvider()
+
+
+async def data_ingestion_job(data_provider: DataProvider):
     """
     Celestial Data Collection Ritual
     Gathers market data across the cosmic web at regular intervals
+
+    Args:
+        data_provider: The cosmic data source
     """
     logger.info(f"\n\nInitiating celestial data collection. {datetime.datetime.now(datetime.UTC).isoformat()}\n\n")
-    await update_ohlcv_data()
-    await update_indicators_data()
+    if not await update_ohlcv_data(data_provider):
+        return
+
+    await update_indicators_data(incremental=True)
 
 
-async def update_ohlcv_data():
+async def update_ohlcv_data(data_provider: DataProvider) -> bool:
     """
     Updates the Cosmic Market Observatory with fresh price data
+
+    Args:
+        data_provider: The cosmic data source
+
+    Returns:
+        Whether any observations were stored
     """
-    data_provider = DataProvider()
-    raw_data, _ = await data_provider.get_current_ohlcv(COINS, interval="30m")
-    current_time = datetime.datetime.fromtimestamp(raw_data[0]["timestamp"] // 1000)
+    raw_data = await fetch_ohlcv_in_batches(data_provider.get_current_ohlcv, COINS, interval="30m")
     raw_repository = OhlcvRepository(table_name="ohlcv_raw")
-    df = pl.from_records(raw_data)
+    df = pl.from_records(raw_data, schema=OHLCV_SCHEMA)
+
+    if df.is_empty():
+        logger.warning("No celestial observations received, skipping collection")
+        return False
+
+    # Every table is independent, so the raw write and the interval merges overlap
+    await asyncio.gather(
+        asyncio.to_thread(raw_repository.update, df, predicate=UPSERT_PREDICATE),
+        *(
+            update_interval_data(
+                OhlcvRepository(table_name=f"ohlcv_{interval_name}"),
+                interval_name,
+                df.lazy(),
+            )
+            for interval_name in interval_names[1:]
+        ),
+    )
 
-    raw_repository.update(df, predicate="s.timestamp == t.timestamp")
+    return True
 
-    for interval_name in interval_names[1:]:
-        interval_repository = OhlcvRepository(table_name=f"ohlcv_{interval_name}")
-        await update_interval_data(
-            interval_repository,
-            interval_name,
-            df,
-            current_time,
-        )
+
+async def fetch_ohlcv_in_batches(
+    fetch_ohlcv,
+    coins: Sequence[str],
+    semaphore: asyncio.Semaphore | None = None,
+    **kwargs,
+) -> list[dict]:
+    """
+    Gathers cosmic observations for many coins at once
+
+    Splits the coins into batches and issues the provider requests concurrently,
+    bounded by PROVIDER_MAX_CONCURRENCY, instead of one long sequential request.
+
+    Args:
+        fetch_ohlcv: The data provider method to call for each batch
+        coins: The celestial bodies to observe
+        semaphore: Shared limit on requests in flight, a new one is made if omitted
+        **kwargs: Passed through to fetch_ohlcv
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(PROVIDER_MAX_CONCURRENCY)
+
+    async def fetch_batch(batch: list[str]) -> list[dict]:
+        async with semaphore:
+            try:
+                raw_data, _ = await fetch_ohlcv(batch, **kwargs)
+            except Exception as e:
+                # A failing batch only loses its own coins, not the whole collection
+                logger.error(f"Error fetching observations for {', '.join(batch)}: {e}")
+                return []
+
+            return raw_data or []
+
+    batches = [list(coins[i : i + PROVIDER_BATCH_SIZE]) for i in range(0, len(coins), PROVIDER_BATCH_SIZE)]
+    results = await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+
+    return [record for raw_data in results for record in raw_data]
 
 
 async def update_interval_data(
     repository: OhlcvRepository, 
     interval_name: str, 
-    new_data_df: pl.DataFrame, 
-    current_time: datetime.datetime
+    new_data_df: pl.LazyFrame
 ):
     """
     Harmonizes temporal data across different cosmic frequencies
@@ -199,149 +289,262 @@ async def update_interval_data(
         repository: The celestial data vault
         interval_name: The temporal dimension to analyze
         new_data_df: Fresh cosmic observations
-        current_time: The moment of observation
     """
-    interval_start_time = get_interval_start_time(current_time, interval_name)
-    existing_df = repository.get_by_timestamp(interval_start_time.timestamp() * 1000)
+    # Provider batches can straddle a bar boundary, so each observation keeps its own interval start
+    aligned_lf = create_new_interval_record(interval_name, new_data_df)
+    interval_starts = (await asyncio.to_thread(aligned_lf.select(pl.col("timestamp").unique()).collect))[
+        "timestamp"
+    ].to_list()
+
+    existing_dfs = await asyncio.gather(
+        *(asyncio.to_thread(repository.get_by_timestamp, interval_start) for interval_start in interval_starts)
+    )
+    existing_dfs = [existing_df for existing_df in existing_dfs if existing_df is not None and len(existing_df) > 0]
 
-    if existing_df is not None and len(existing_df) > 0:
-        updated_df = update_interval_record(existing_df, new_data_df)
+    if existing_dfs:
+        updated_lf = update_interval_record(pl.concat(existing_dfs), aligned_lf)
     else:
-        updated_df = create_new_interval_record(interval_start_time, interval_name, new_data_df)
+        updated_lf = aligned_lf
 
-    repository.update(updated_df, predicate="s.timestamp == t.timestamp")
+    # The whole interval pipeline runs as one plan, materialized only for the write
+    updated_df = await asyncio.to_thread(updated_lf.collect)
+    await asyncio.to_thread(repository.update, updated_df, predicate=UPSERT_PREDICATE)
 
 
-def update_interval_record(existing_df, new_data_df):
+def get_interval_start(interval_name: str) -> pl.Expr:
     """
-    Merges new observations with existing celestial records
+    Aligns every observation timestamp to the beginning of its temporal dimension
+
+    Works on whole columns, so current and historical observations share one path.
     """
-    existing_df = existing_df.with_columns(
-        pl.col("close").cast(pl.Float64),
-        pl.col("high").cast(pl.Float64),
-        pl.col("low").cast(pl.Float64),
-        pl.col("volume").cast(pl.Float64),
-    )
+    return pl.col("timestamp").cast(pl.Datetime("ms")).dt.truncate(interval_name).dt.epoch("ms")
 
-    new_data_df = new_data_df.with_columns(
-        pl.col("close").cast(pl.Float64),
-        pl.col("high").cast(pl.Float64),
-        pl.col("low").cast(pl.Float64),
-        pl.col("volume").cast(pl.Float64),
-    )
 
-    return pl.DataFrame(
-        {
-            "timestamp": existing_df["timestamp"],
-            "symbol": existing_df["symbol"],
-            "open": existing_df["open"],
-            "high": pl.max_horizontal(existing_df["high"], new_data_df["high"]),
-            "low": pl.min_horizontal(existing_df["low"], new_data_df["low"]),
-            "close": new_data_df["close"],
-            "volume": existing_df["volume"] + new_data_df["volume"],
-        }
+def update_interval_record(existing_df: pl.DataFrame, new_data_df: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Merges new observations, already aligned to their interval start, with existing celestial records
+    """
+    # Records are matched by interval start and symbol, unmatched symbols start a new record
+    return (
+        new_data_df.join(
+            # Stored records may predate OHLCV_SCHEMA and carry inferred (e.g. string) types
+            existing_df.lazy().cast(OHLCV_SCHEMA),
+            on=["timestamp", "symbol"],
+            how="left",
+            suffix="_existing",
+        )
+        .select(
+            pl.col("timestamp"),
+            pl.col("symbol"),
+            pl.coalesce("open_existing", "open").alias("open"),
+            pl.max_horizontal("high", "high_existing").alias("high"),
+            pl.min_horizontal("low", "low_existing").alias("low"),
+            pl.col("close"),
+            (pl.col("volume") + pl.col("volume_existing").fill_null(0)).alias("volume"),
+        )
     )
 
 
 def create_new_interval_record(
-    interval_start_time: datetime.datetime, 
     interval_name: str, 
-    new_data_df: pl.DataFrame
-):
+    new_data_df: pl.LazyFrame
+) -> pl.LazyFrame:
     """
     Creates a new celestial record for the given temporal dimension
     """
-    return pl.DataFrame(
-        {
-            "timestamp": pl.Series([interval_start_time.timestamp() * 1000] * len(new_data_df)),
-            "symbol": new_data_df["symbol"],
-            "open": new_data_df["open"],
-            "high": new_data_df["high"],
-            "low": new_data_df["low"],
-            "close": new_data_df["close"],
-            "volume": new_data_df["volume"],
-        }
+    return new_data_df.select(
+        get_interval_start(interval_name).alias("timestamp"),
+        "symbol",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
     )
 
 
-async def update_indicators_data():
+async def update_indicators_data(incremental: bool = False):
     """
     Calculates celestial patterns and harmonics across all temporal dimensions
+
+    Args:
+        incremental: Only write records that are not stored yet or may still change
     """
-    for interval_name in interval_names:
-        logger.info(f"Updating indicators for {interval_name} interval")
-        
-        ohlcv_repository = OhlcvRepository(table_name=f"ohlcv_{interval_name}")
-        indicators_repository = IndicatorsRepository(table_name=f"indicators_{interval_name}")
+    await asyncio.gather(
+        *(update_interval_indicators(interval_name, incremental) for interval_name in interval_names)
+    )
 
-        df = ohlcv_repository.get_all()
-        if df is None or len(df) == 0:
-            continue
 
-        df = df.sort(by=["symbol", "timestamp"])
+async def update_interval_indicators(interval_name: str, incremental: bool = False):
+    """
+    Calculates celestial patterns for a single temporal dimension
+
+    Args:
+        interval_name: The temporal dimension to analyze
+        incremental: Only write records that are not stored yet or may still change
+    """
+    logger.info(f"Updating indicators for {interval_name} interval")
+
+    ohlcv_repository = OhlcvRepository(table_name=f"ohlcv_{interval_name}")
+    indicators_repository = IndicatorsRepository(table_name=f"indicators_{interval_name}")
 
-        for symbol in df["symbol"].unique():
-            symbol_df = df.filter(pl.col("symbol") == symbol)
-            if len(symbol_df) == 0:
-                continue
+    # Repositories are blocking, run them off the event loop so intervals overlap
+    df = await asyncio.to_thread(ohlcv_repository.get_all)
+    if df is None or len(df) == 0:
+        return
 
-            try:
-                indicators = calculate_ta_indicators(symbol_df)
-                indicators_repository.update(
-                    indicators, predicate="s.timestamp == t.timestamp AND s.symbol == t.symbol"
-                )
-            except Exception as e:
-                logger.error(f"Error calculating indicators for {symbol}: {e}")
-                continue
+    indicators = await asyncio.to_thread(calculate_interval_indicators, df)
+    if indicators is None:
+        return
+
+    if incremental:
+        stored_df = await asyncio.to_thread(indicators_repository.get_all)
+        indicators = select_unstored_indicators(indicators, stored_df)
+
+    await asyncio.to_thread(
+        indicators_repository.update,
+        indicators,
+        predicate=UPSERT_PREDICATE,
+    )
 
 
-async def seed():
+def select_unstored_indicators(indicators: pl.DataFrame, stored_df: pl.DataFrame | None) -> pl.DataFrame:
     """
-    Initializes the cosmic database with historical celestial data
+    Keeps the celestial harmonics that still need to be written
+
+    The newest record of each symbol is always kept since its bar may still be
+    forming, together with every record missing from storage, so skipped ticks
+    and symbols that just gained enough history are filled in.
     """
-    data_provider = DataProvider()
+    if stored_df is None or len(stored_df) == 0:
+        return indicators
 
-    for interval_name in interval_names:
-        logger.info(f"Seeding {interval_name} interval")
-        
-        if interval_name == "raw":
-            interval = "30m"
-        else:
-            interval = interval_name
+    stored_keys = (
+        stored_df.select("timestamp", "symbol")
+        .cast({"timestamp": indicators.schema["timestamp"], "symbol": indicators.schema["symbol"]})
+        .with_columns(pl.lit(True).alias("stored"))
+    )
 
-        raw_data, _ = await data_provider.get_historical_ohlcv(
-            COINS,
-            interval=interval,
-            limit=1000 if interval_name == "raw" else 100,
-        )
+    return (
+        indicators.join(stored_keys, on=["timestamp", "symbol"], how="left")
+        .filter((pl.col("timestamp") == pl.col("timestamp").max().over("symbol")) | pl.col("stored").is_null())
+        .drop("stored")
+    )
 
-        if not raw_data:
+
+def calculate_interval_indicators(df: pl.DataFrame):
+    """
+    Reads the celestial harmonics of every symbol in the given observations
+    """
+    df = df.sort(by=["symbol", "timestamp"])
+
+    # Rows of a symbol are contiguous after the sort, so each one is a zero-copy slice
+    symbol_indicators = []
+    offset = 0
+    for symbol, length in df.group_by("symbol", maintain_order=True).len().iter_rows():
+        symbol_df = df.slice(offset, length)
+        offset += length
+
+        if length < MIN_INDICATOR_ROWS:
+            continue
+
+        try:
+            symbol_indicators.append(calculate_ta_indicators(symbol_df))
+        except Exception as e:
+            logger.error(f"Error calculating indicators for {symbol}: {e}")
             continue
 
-        df = pl.from_records(raw_data)
+    if not symbol_indicators:
+        return None
+
+    return pl.concat(symbol_indicators, how="diagonal_relaxed")
+
+
+async def seed(data_provider: DataProvider):
+    """
+    Initializes the cosmic database with historical celestial data
+
+    Args:
+        data_provider: The cosmic data source
+    """
+    semaphore = asyncio.Semaphore(SEED_MAX_CONCURRENCY)
 
-        repository = OhlcvRepository(table_name=f"ohlcv_{interval_name}")
-        repository.update(df, predicate="s.timestamp == t.timestamp")
+    await asyncio.gather(
+        *(seed_interval(data_provider, interval_name, semaphore) for interval_name in interval_names)
+    )
 
     await update_indicators_data()
 
 
-async def process(loop):
+async def seed_interval(data_provider: DataProvider, interval_name: str, semaphore: asyncio.Semaphore):
+    """
+    Fills a single temporal dimension with historical celestial data
+
+    Args:
+        data_provider: The cosmic data source
+        interval_name: The temporal dimension to seed
+        semaphore: Limit on historical requests in flight, shared by all intervals
+    """
+    logger.info(f"Seeding {interval_name} interval")
+
+    if interval_name == "raw":
+        interval = "30m"
+    else:
+        interval = interval_name
+
+    raw_data = await fetch_ohlcv_in_batches(
+        data_provider.get_historical_ohlcv,
+        COINS,
+        semaphore,
+        interval=interval,
+        limit=1000 if interval_name == "raw" else 100,
+    )
+
+    if not raw_data:
+        return
+
+    df = pl.from_records(raw_data, schema=OHLCV_SCHEMA)
+
+    # Historical bars are keyed by the same interval starts as the collected ones
+    if interval_name != "raw":
+        df = df.with_columns(get_interval_start(interval_name).alias("timestamp"))
+
+    repository = OhlcvRepository(table_name=f"ohlcv_{interval_name}")
+    await asyncio.to_thread(repository.update, df, predicate=UPSERT_PREDICATE)
+
+
+async def schedule_cron(data_provider: DataProvider):
+    """
+    Binds the celestial data collection ritual to the cosmic clock
+
+    Args:
+        data_provider: The cosmic data source
+    """
+    ingestion_cron = aiocron.crontab(INGESTION_CRON, func=data_ingestion_job, args=(data_provider,), start=True)
+    try:
+        # Keep the task alive for as long as the cron is scheduled
+        await asyncio.Event().wait()
+    finally:
+        ingestion_cron.stop()
+
+
+async def process():
     """
     Orchestrates the eternal dance of celestial data collection
     """
-    await seed()
-    await data_ingestion_job()
+    data_provider = get_data_provider()
+
+    # Collections read and write the same tables as seeding, so they only start once it is done
+    await seed(data_provider)
+    await data_ingestion_job(data_provider)
+    await schedule_cron(data_provider)
 
 
 def main():
     """
     Initiates the cosmic observation process
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(process(loop))
-    loop.close()
+    asyncio.run(process())
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 from typing import List, Literal, Union
 from datetime import datetime, UTC
-import pyarrow.compute as pc
 
 from QuantaraAI_core.plugins.utilities.base import BaseUtility
 from QuantaraAI_core.plugins.utilities.llm import LLMUtility